@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from wine_dashboard.core import stratified_downsample
+
+
+def make_wines(n=60000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Rating': rng.integers(80, 101, n).astype('int8'),
+        'Price_USD': rng.lognormal(3.3, 0.6, n).astype('float32'),
+    })
+
+
+def test_stratified_downsample_caps_points():
+    wines = make_wines()
+    sampled = stratified_downsample(wines, 'Rating', 'Price_USD', n_out=5000)
+    assert len(sampled) <= 5000
+
+
+def test_stratified_downsample_keeps_price_extremes():
+    wines = make_wines()
+    sampled = stratified_downsample(wines, 'Rating', 'Price_USD', n_out=5000)
+    assert sampled['Price_USD'].max() == wines['Price_USD'].max()
+    assert sampled['Price_USD'].min() == wines['Price_USD'].min()
+    expected = wines.groupby('Rating')['Price_USD'].agg(['min', 'max'])
+    kept = sampled.groupby('Rating')['Price_USD'].agg(['min', 'max'])
+    pd.testing.assert_frame_equal(kept, expected)
+
+
+def test_stratified_downsample_returns_small_frames_unchanged():
+    wines = make_wines(n=100)
+    assert stratified_downsample(wines, 'Rating', 'Price_USD', n_out=5000) is wines
@@ -0,0 +1,360 @@
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+# Load data
+PARQUET_PATH = "./df_wine_eda.parquet"
+PLOT_COLUMNS = ['Country', 'Region', 'Grape', 'Price_USD', 'Rating']
+
+@st.cache_data
+def load_data():
+    df = pd.read_parquet(PARQUET_PATH, columns=PLOT_COLUMNS)
+    for col in ('Country', 'Region', 'Grape'):
+        df[col] = df[col].astype('category')
+    # Narrow numeric dtypes halve the bytes the range filters have to scan
+    df['Rating'] = pd.to_numeric(df['Rating'], downcast='integer')
+    df['Price_USD'] = df['Price_USD'].astype('float32')
+    # Focus-mode flags, so reruns don't repeat the substring scans
+    df['_is_burgundy'] = df['Region'].str.contains('Burgundy', case=False, na=False).to_numpy(dtype=bool)
+    df['_is_pinot'] = df['Grape'].str.contains('Pinot Noir', case=False, na=False).to_numpy(dtype=bool)
+    return df
+
+@st.cache_data
+def load_full_data():
+    # All columns, for the data table and export; row order matches load_data()
+    return pd.read_parquet(PARQUET_PATH)
+
+@st.cache_data
+def load_option_index():
+    df = load_data()
+    # country -> regions and country -> {region -> grapes}, for the cascading dropdowns
+    country_to_regions = (
+        df.dropna(subset=['Country', 'Region'])
+        .groupby('Country', observed=True)['Region'].unique().apply(sorted).to_dict()
+    )
+    country_region_to_grapes = {}
+    grapes = (
+        df.dropna(subset=['Country', 'Region', 'Grape'])
+        .groupby(['Country', 'Region'], observed=True)['Grape'].unique().apply(sorted)
+    )
+    for (country, region), region_grapes in grapes.items():
+        country_region_to_grapes.setdefault(country, {})[region] = region_grapes
+    return country_to_regions, country_region_to_grapes
+
+def regions_for(country_to_regions, countries):
+    return sorted(set().union(*(country_to_regions.get(c, []) for c in countries)))
+
+def grapes_for(country_region_to_grapes, countries, regions):
+    # Walks only the selected countries' own regions, not countries x regions
+    selected_regions = set(regions)
+    return sorted(set().union(*(
+        region_grapes
+        for c in countries
+        for r, region_grapes in country_region_to_grapes.get(c, {}).items()
+        if r in selected_regions
+    )))
+
+# Filtering, keyed on the hashable widget values
+# Slider values are continuous, so bound how many selections stay cached
+FILTER_CACHE_ENTRIES = 32
+EXPORT_CACHE_ENTRIES = 4
+
+@st.cache_data
+def load_filter_bounds():
+    df = load_data()
+    # Whole-column facts selects_all_rows needs, computed once instead of per rerun
+    return {
+        'labels_complete': bool(df[['Country', 'Region', 'Grape']].notna().all(axis=None)),
+        'price': (float(df['Price_USD'].min()), float(df['Price_USD'].max())),
+        'rating': (int(df['Rating'].min()), int(df['Rating'].max())),
+    }
+
+def selects_all_rows(df, countries, regions, grapes, price_range, rating_range, focus):
+    # O(categories) check for the "nothing excluded" case; the column-wide
+    # facts come from load_filter_bounds()
+    if focus:
+        return False
+    for col, selected in (('Country', countries), ('Region', regions), ('Grape', grapes)):
+        categories = df[col].cat.categories
+        if len(selected) < len(categories) or not set(selected).issuperset(categories.tolist()):
+            return False
+    bounds = load_filter_bounds()
+    return (
+        bounds['labels_complete']
+        and price_range[0] <= bounds['price'][0] and price_range[1] >= bounds['price'][1]
+        and rating_range[0] <= bounds['rating'][0] and rating_range[1] >= bounds['rating'][1]
+    )
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def filter_mask(countries, regions, grapes, price_range, rating_range, focus):
+    df = load_data()
+    if selects_all_rows(df, countries, regions, grapes, price_range, rating_range, focus):
+        return np.ones(len(df), dtype=bool)
+    # AND the predicates into one reused buffer instead of chaining `&` temporaries
+    if focus:
+        mask = (df['Country'] == 'France').to_numpy(dtype=bool, copy=True)
+        np.logical_and(mask, df['_is_burgundy'].to_numpy(), out=mask)
+        np.logical_and(mask, df['_is_pinot'].to_numpy(), out=mask)
+    else:
+        mask = df['Country'].isin(countries).to_numpy(dtype=bool, copy=True)
+        np.logical_and(mask, df['Region'].isin(regions).to_numpy(dtype=bool), out=mask)
+        np.logical_and(mask, df['Grape'].isin(grapes).to_numpy(dtype=bool), out=mask)
+    price = df['Price_USD'].to_numpy()
+    rating = df['Rating'].to_numpy()
+    np.logical_and(mask, price >= price_range[0], out=mask)
+    np.logical_and(mask, price <= price_range[1], out=mask)
+    np.logical_and(mask, rating >= rating_range[0], out=mask)
+    np.logical_and(mask, rating <= rating_range[1], out=mask)
+    return mask
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def compute_filter(countries, regions, grapes, price_range, rating_range, focus):
+    # Only the plotted columns are copied; the export slices the full rows separately
+    df = load_data()
+    if selects_all_rows(df, countries, regions, grapes, price_range, rating_range, focus):
+        return df[PLOT_COLUMNS]
+    return df.loc[filter_mask(countries, regions, grapes, price_range, rating_range, focus), PLOT_COLUMNS]
+
+@st.cache_data
+def top_countries_counts(data):
+    counts = data['Country'].value_counts().head(10).reset_index()
+    counts.columns = ['Country', 'Count']
+    counts['Country'] = counts['Country'].astype(str)
+    return counts
+
+@st.cache_data
+def avg_price_by_country(data):
+    # Single-pass mean over the categorical codes instead of the hash groupby
+    categories = data['Country'].cat.categories
+    codes = data['Country'].cat.codes.to_numpy()
+    valid = codes >= 0
+    sums = np.bincount(codes[valid], weights=data['Price_USD'].to_numpy()[valid], minlength=len(categories))
+    counts = np.bincount(codes[valid], minlength=len(categories))
+    observed = counts > 0
+    return pd.Series(
+        sums[observed] / counts[observed],
+        index=pd.Index(categories[observed], name='Country'),
+        name='Price_USD',
+    )
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def price_summary(filter_key):
+    # Same rows as describe(percentiles=[.25, .5, .75, .9]), from one np.quantile call
+    prices = compute_filter(*filter_key)['Price_USD'].to_numpy(dtype=float)
+    index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', '90%', 'max']
+    if prices.size == 0:
+        return pd.Series([0] + [np.nan] * 8, index=index, name='Price_USD', dtype=float)
+    q = np.quantile(prices, [0, .25, .5, .75, .9, 1])
+    std = prices.std(ddof=1) if prices.size > 1 else np.nan
+    return pd.Series(
+        [prices.size, prices.mean(), std, q[0], q[1], q[2], q[3], q[4], q[5]],
+        index=index,
+        name='Price_USD',
+    )
+
+MAX_BOX_OUTLIERS = 500
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def price_histogram(filter_key, nbins=50):
+    # Bin log10(price) on the server so only the bin counts reach the browser
+    prices = compute_filter(*filter_key)['Price_USD'].to_numpy(dtype=float)
+    prices = prices[prices > 0]
+    if prices.size == 0:
+        return None
+    counts, edges = np.histogram(np.log10(prices), bins=nbins)
+    q1, median, q3 = np.quantile(prices, [.25, .5, .75])
+    iqr = q3 - q1
+    lower = prices[prices >= q1 - 1.5 * iqr].min()
+    upper = prices[prices <= q3 + 1.5 * iqr].max()
+    box = np.log10([lower, q1, median, q3, upper])
+    # Distinct outlier prices for the marginal box, capped like the scatter points
+    outliers = np.unique(prices[(prices < lower) | (prices > upper)])
+    if outliers.size > MAX_BOX_OUTLIERS:
+        outliers = outliers[np.linspace(0, outliers.size - 1, MAX_BOX_OUTLIERS).astype(np.int64)]
+    return counts, edges, box, outliers
+
+# Color palette
+wine_red = "#6F1D1B"
+wine_purple = "#4B3B51"
+wine_rose = "#D4A5A5"
+wine_earth = "#8E6B23"
+
+# Overview figures only depend on the unfiltered data, so build them once
+@st.cache_resource
+def build_top_countries_fig():
+    data = load_data()
+    top_countries = top_countries_counts(data)
+    fig = px.bar(
+        top_countries,
+        x='Count',
+        y='Country',
+        orientation='h',
+        color_discrete_sequence=[wine_purple],
+        title="Top 10 Wine-Producing Countries",
+        text='Count'
+    )
+    fig.update_layout(yaxis={'categoryorder':'total ascending'}, margin=dict(l=50, r=10, t=50, b=10))
+    fig.update_traces(textposition='outside')
+    return fig
+
+@st.cache_resource
+def build_avg_price_fig():
+    data = load_data()
+    avg_price_country = avg_price_by_country(data).nlargest(10).reset_index()
+    fig = px.bar(
+        avg_price_country,
+        x='Price_USD',
+        y='Country',
+        orientation='h',
+        color_discrete_sequence=[wine_rose],
+        title="Top 10 Countries by Average Price",
+        text_auto='$,.2f'
+    )
+    fig.update_layout(yaxis={'categoryorder':'total ascending'}, margin=dict(l=50, r=10, t=50, b=10))
+    fig.update_traces(textposition='outside')
+    return fig
+
+@st.cache_resource
+def build_ratings_box_fig():
+    data = load_data()
+    top_countries = top_countries_counts(data)
+    ratings_countries = data[data['Country'].isin(top_countries['Country'])]
+    fig = px.box(
+        ratings_countries,
+        x='Country',
+        y='Rating',
+        color_discrete_sequence=[wine_earth],
+        category_orders={'Country': top_countries['Country'].tolist()},
+        title="Wine Ratings by Country",
+        points="outliers",
+        labels={'Rating': 'Rating (Points)'}
+    )
+    fig.update_layout(xaxis_tickangle=-45, margin=dict(l=50, r=10, t=50, b=100))
+    return fig
+
+@st.cache_resource
+def build_choropleth_fig():
+    data = load_data()
+    avg_price_map = avg_price_by_country(data).reset_index()
+    fig = px.choropleth(
+        avg_price_map,
+        locations="Country",
+        locationmode='country names',
+        color="Price_USD",
+        color_continuous_scale=px.colors.sequential.PuRd,
+        title="Average Wine Price by Country",
+        labels={'Price_USD': 'Avg Price (USD)'}
+    )
+    fig.update_layout(margin={"r":0, "t":30, "l":0, "b":0})
+    return fig
+
+def price_ticks(log_lo, log_hi):
+    # 1-2-5 steps per decade, refined to 1..9 and then to even log spacing
+    # until at least two ticks fall inside the binned range
+    decades = range(int(np.floor(log_lo)), int(np.ceil(log_hi)) + 1)
+    for mantissas in ([1, 2, 5], range(1, 10)):
+        ticks = [m * 10.0 ** d for d in decades for m in mantissas]
+        ticks = [t for t in ticks if log_lo <= np.log10(t) <= log_hi]
+        if len(ticks) >= 2:
+            return ticks, [f"${t:,.0f}" if t >= 1 else f"${t:,.2f}" for t in ticks]
+    ticks = list(10 ** np.linspace(log_lo, log_hi, 5))
+    return ticks, [f"${t:,.2f}" for t in ticks]
+
+def build_price_hist_fig(hist):
+    # Log-price histogram drawn from pre-binned counts, with a precomputed marginal box
+    counts, edges, (lower, q1, median, q3, upper), outliers = hist
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+    fig.add_trace(
+        go.Box(
+            y=['Price_USD'],
+            lowerfence=[lower], q1=[q1], median=[median], q3=[q3], upperfence=[upper],
+            orientation='h',
+            marker_color=wine_red,
+            hoverinfo='skip',
+            showlegend=False
+        ),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=np.log10(outliers),
+            y=['Price_USD'] * len(outliers),
+            customdata=outliers,
+            mode='markers',
+            marker=dict(color=wine_red, size=4),
+            hovertemplate="$%{customdata:,.2f}<extra></extra>",
+            showlegend=False
+        ),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            customdata=np.column_stack([10 ** edges[:-1], 10 ** edges[1:]]),
+            hovertemplate="$%{customdata[0]:,.2f} - $%{customdata[1]:,.2f}<br>Count: %{y}<extra></extra>",
+            marker_color=wine_red,
+            showlegend=False
+        ),
+        row=2, col=1
+    )
+    ticks, tick_labels = price_ticks(edges[0], edges[-1])
+    fig.update_xaxes(tickvals=np.log10(ticks), ticktext=tick_labels, row=2, col=1)
+    fig.update_yaxes(showticklabels=False, row=1, col=1)
+    fig.update_yaxes(title_text="count", row=2, col=1)
+    fig.update_layout(
+        title="Price Distribution of Filtered Wines (Log Scale)",
+        xaxis2_title="Price_USD",
+        bargap=0,
+        margin=dict(l=50, r=10, t=50, b=40)
+    )
+    return fig
+
+# Scatter downsampling
+MAX_SCATTER_POINTS = 5000
+
+def stratified_downsample(data, group_col, value_col, n_out=MAX_SCATTER_POINTS):
+    # Rating has only ~20 distinct values, so sample within each rating: keep its
+    # min and max price, then spread the remaining budget evenly over its
+    # price-sorted rows in proportion to the group's size
+    if len(data) <= n_out:
+        return data
+    data = data.sort_values([group_col, value_col], kind='mergesort')
+    groups = data[group_col].to_numpy()
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    sizes = np.diff(np.r_[starts, len(data)])
+    budget = max(n_out - 2 * len(starts), 0)
+    quotas = (sizes * budget) // len(data)
+    keep = [
+        start + np.unique(np.linspace(0, size - 1, min(size, quota + 2)).round().astype(np.int64))
+        for start, size, quota in zip(starts, sizes, quotas)
+    ]
+    return data.iloc[np.concatenate(keep)]
+
+@st.cache_data(max_entries=FILTER_CACHE_ENTRIES)
+def downsample_scatter(filter_key, n_out=MAX_SCATTER_POINTS):
+    return stratified_downsample(compute_filter(*filter_key), 'Rating', 'Price_USD', n_out)
+
+# Full-column rows for the data table and the export
+@st.cache_data(max_entries=EXPORT_CACHE_ENTRIES)
+def filtered_rows(filter_key):
+    return load_full_data()[filter_mask(*filter_key)]
+
+@st.cache_data(max_entries=EXPORT_CACHE_ENTRIES)
+def zip_filtered_data(filter_key):
+    df_to_zip = filtered_rows(filter_key)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        # Stream the CSV straight into the archive instead of building it as one string
+        with zf.open("filtered_wines.csv", mode="w") as raw:
+            with io.TextIOWrapper(raw, encoding='utf-8', newline='') as text:
+                df_to_zip.to_csv(text, index=False)
+    buffer.seek(0)
+    return buffer